@@ -0,0 +1,7 @@
+-- ---------------------------------------------------------
+-- MAINTENANCE RECORDS CLUSTERING
+-- ---------------------------------------------------------
+-- The Analytics monthly trend filters MAINTENANCE_RECORDS by FORKLIFT_ID;
+-- clustering on it lets Snowflake prune micro-partitions for that filter.
+ALTER TABLE NNL_FORKLIFT_FLEET_DB.OPERATIONS.MAINTENANCE_RECORDS
+    CLUSTER BY (FORKLIFT_ID);
@@ -0,0 +1,20 @@
+-- ---------------------------------------------------------
+-- DAILY MAINTENANCE COST
+-- ---------------------------------------------------------
+-- Per-forklift, per-day maintenance cost, read by the Analytics page.
+-- Snowflake keeps it within 15 minutes of MAINTENANCE_RECORDS. It holds no
+-- CURRENT_DATE() logic, so skipped refreshes on a quiet table can't leave a
+-- stale 30-day window behind; the app applies that filter at read time.
+CREATE OR REPLACE DYNAMIC TABLE NNL_FORKLIFT_FLEET_DB.OPERATIONS.OPS_MAINT_DAILY
+    TARGET_LAG = '15 minutes'
+    WAREHOUSE = ANALYTICS_WH
+AS
+    SELECT
+        FORKLIFT_ID,
+        PERFORMED_DATE,
+        SUM(COST) AS DAILY_COST
+    FROM NNL_FORKLIFT_FLEET_DB.OPERATIONS.MAINTENANCE_RECORDS
+    GROUP BY 1, 2;
+
+-- Replaced by OPS_MAINT_DAILY above
+DROP DYNAMIC TABLE IF EXISTS NNL_FORKLIFT_FLEET_DB.OPERATIONS.OPS_MAINT_SUMMARY;
@@ -0,0 +1,35 @@
+-- ---------------------------------------------------------
+-- 30-DAY USAGE ROLLUP
+-- ---------------------------------------------------------
+-- Pre-aggregated utilization + energy per forklift, read by the Analytics
+-- page. A materialized view can't filter on CURRENT_DATE(), so a nightly
+-- task rebuilds a small rollup table instead.
+USE DATABASE NNL_FORKLIFT_FLEET_DB;
+
+CREATE TABLE IF NOT EXISTS OPERATIONS.OPS_USAGE_30D (
+    FORKLIFT_ID  STRING,
+    AVG_HOURS    FLOAT,
+    DAYS_LOGGED  NUMBER,
+    TOTAL_ENERGY FLOAT,
+    AVG_ENERGY   FLOAT
+);
+
+CREATE OR REPLACE TASK OPERATIONS.REFRESH_OPS_USAGE_30D
+    WAREHOUSE = ANALYTICS_WH
+    SCHEDULE = 'USING CRON 0 2 * * * UTC'
+AS
+    INSERT OVERWRITE INTO OPERATIONS.OPS_USAGE_30D
+    SELECT
+        FORKLIFT_ID,
+        AVG(END_HOUR_METER - START_HOUR_METER) AS AVG_HOURS,
+        COUNT(*) AS DAYS_LOGGED,
+        SUM(ENERGY_CONSUMED_KWH) AS TOTAL_ENERGY,
+        AVG(ENERGY_CONSUMED_KWH) AS AVG_ENERGY
+    FROM OPERATIONS.USAGE_LOG
+    WHERE SHIFT_DATE >= DATEADD(day, -30, CURRENT_DATE())
+    GROUP BY 1;
+
+ALTER TASK OPERATIONS.REFRESH_OPS_USAGE_30D RESUME;
+
+-- Populate the rollup immediately instead of waiting for the first run
+EXECUTE TASK OPERATIONS.REFRESH_OPS_USAGE_30D;
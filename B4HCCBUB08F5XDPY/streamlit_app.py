@@ -1,10 +1,15 @@
 import streamlit as st
 import pandas as pd
-from snowflake.snowpark.functions import col, current_timestamp
-from snowflake.snowpark.types import *
-from datetime import datetime, date, timedelta
-import plotly.express as px
+import json
+from snowflake.snowpark.functions import col
+from snowflake.snowpark.types import (
+    StructType, StructField,
+    StringType, IntegerType, DoubleType,
+    DateType, TimestampType, BooleanType
+)
+from datetime import datetime, date
 from snowflake.snowpark.context import get_active_session
+from snowflake.snowpark.exceptions import SnowparkSQLException
 # ---------------------------------------------------------
 # PAGE SETUP
 # ---------------------------------------------------------
@@ -24,76 +29,341 @@ def create_session():
 # CREATE SESSION PROPERLY
 session = create_session()
 
+APP_QUERY_TAG = "forklift-streamlit"
+
+# History-style view tabs only fetch the most recent rows
+VIEW_ROW_LIMIT = 1000
+
+# Analytics cost summary shows the most expensive forklifts by default
+SUMMARY_ROW_LIMIT = 100
+
 # ---------------------------------------------------------
 # HELPER FUNCTIONS
 # ---------------------------------------------------------
+# Lookup lists are cached as plain dicts so widget reruns skip Snowflake
+@st.cache_data(ttl=300, show_spinner=False)
 def load_reference_data(table_name):
-    return session.table(f"REFERENCE.{table_name}").collect()
+    return [r.as_dict() for r in session.table(f"REFERENCE.{table_name}").collect()]
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_forklift_list():
-    return session.table("OPERATIONS.FORKLIFTS").select("FORKLIFT_ID", "MODEL", "STATUS").collect()
+    return [
+        r.as_dict()
+        for r in session.table("OPERATIONS.FORKLIFTS").select("FORKLIFT_ID", "MODEL", "STATUS").collect()
+    ]
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_operators():
+    return (
+        session.table("OPERATIONS.OPERATORS")
+        .select("OPERATOR_ID", "EMPLOYEE_ID", "FULL_NAME", "EMPLOYMENT_YEAR", "IS_ACTIVE")
+        .to_pandas()
+    )
 
-def get_operator_list():
-    return session.table("OPERATIONS.OPERATORS").filter(col("IS_ACTIVE") == True).collect()
+# ---------------------------------------------------------
+# ANALYTICS QUERIES
+# ---------------------------------------------------------
+# Snowflake error code for "object does not exist or not authorized"
+OBJECT_MISSING = 2003
+
+def report_missing_object(e, script):
+    # Analytics objects are created by the scripts in sql/, not by the app
+    if e.sql_error_code != OBJECT_MISSING:
+        raise e
+    st.error(f"❌ Analytics data is not set up yet. Run sql/{script} in Snowflake.")
+
+# Nightly rollup of USAGE_LOG (see sql/ops_usage_30d.sql)
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_usage_30d():
+    return session.table("OPERATIONS.OPS_USAGE_30D").to_pandas()
+
+# Rolled up from the daily-cost dynamic table (see sql/ops_maint_daily.sql);
+# the 30-day window is applied here so it always tracks today's date.
+# One row per forklift, so it is fetched whole and trimmed for display
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_maintenance_summary():
+    return session.sql(
+        """
+        SELECT
+            FORKLIFT_ID,
+            SUM(DAILY_COST) AS TOTAL_MAINTENANCE_COST,
+            COALESCE(SUM(CASE WHEN PERFORMED_DATE >= DATEADD(day, -30, CURRENT_DATE()) THEN DAILY_COST END), 0)
+                AS LAST_30_DAYS_COST
+        FROM NNL_FORKLIFT_FLEET_DB.OPERATIONS.OPS_MAINT_DAILY
+        GROUP BY 1
+        ORDER BY TOTAL_MAINTENANCE_COST DESC
+        """
+    ).to_pandas()
+
+# Keyed by the sorted selection so revisiting a selection is instant
+@st.cache_data(ttl=900, show_spinner=False)
+def fetch_monthly_cost(selected):
+    # Selection is bound as one JSON array: the SQL text never changes
+    # (result-cache friendly) and the FORKLIFT_ID filter can prune
+    # partitions (see sql/maintenance_records_clustering.sql)
+    return session.sql(
+        """
+        SELECT
+            DATE_TRUNC('month', PERFORMED_DATE) AS MONTH,
+            FORKLIFT_ID,
+            SUM(COST) AS MONTHLY_COST
+        FROM NNL_FORKLIFT_FLEET_DB.OPERATIONS.MAINTENANCE_RECORDS
+        WHERE FORKLIFT_ID IN (
+            SELECT VALUE::STRING FROM TABLE(FLATTEN(PARSE_JSON(?)))
+        )
+        GROUP BY 1, 2
+        """,
+        params=[json.dumps(selected)]
+    ).to_pandas().sort_values("MONTH")  # tiny result; sort client-side
 
 # ---------------------------------------------------------
-# SIDEBAR NAVIGATION
+# TABLE SCHEMAS
 # ---------------------------------------------------------
-st.sidebar.title("Navigation")
-page = st.sidebar.selectbox(
-    "Select Page",
-    ["Dashboard", "Fleet Management", "Operator Management", "Battery Management", "Usage Logging",
-     "Maintenance", "Maintenance History", "Fault Reporting", "Analytics"]
-)
+# Built once at import rather than on every form submission
+FORKLIFT_SCHEMA = StructType([
+    StructField("FORKLIFT_ID", StringType()),
+    StructField("SERIAL_NUMBER", StringType()),
+    StructField("MODEL", StringType()),
+    StructField("MANUFACTURE_YEAR", IntegerType()),
+    StructField("PURCHASE_DATE", DateType()),
+    StructField("RATED_CAPACITY_KG", IntegerType()),
+    StructField("BATTERY_ID", IntegerType()),
+    StructField("LOCATION_SITE", StringType()),
+    StructField("STATUS", StringType()),
+    StructField("WARRANTY_EXPIRY", DateType()),
+    StructField("NOTES", StringType()),
+    StructField("CREATED_AT", TimestampType()),
+    StructField("UPDATED_AT", TimestampType()),
+])
+
+OPERATOR_SCHEMA = StructType([
+    StructField("EMPLOYEE_ID", StringType()),
+    StructField("FULL_NAME", StringType()),
+    StructField("EMPLOYMENT_YEAR", DateType()),
+    StructField("IS_ACTIVE", BooleanType()),
+])
+
+BATTERY_SCHEMA = StructType([
+    StructField("BATTERY_ID", IntegerType()),
+    StructField("BATTERY_SERIAL", StringType()),
+    StructField("FORKLIFT_ID", StringType()),
+    StructField("VOLTAGE", DoubleType()),
+    StructField("CAPACITY_AH", IntegerType()),
+    StructField("PURCHASE_DATE", DateType()),
+    StructField("TOTAL_CYCLES", IntegerType()),
+    StructField("HEALTH_PERCENTAGE", DoubleType()),
+    StructField("LAST_FULL_CHARGE", DateType()),
+    StructField("STATUS", StringType()),
+    StructField("CREATED_AT", TimestampType()),
+    StructField("UPDATED_AT", TimestampType()),
+])
+
+USAGE_SCHEMA = StructType([
+    StructField("FORKLIFT_ID", StringType()),
+    StructField("SHIFT_DATE", DateType()),
+    StructField("START_HOUR_METER", DoubleType()),
+    StructField("END_HOUR_METER", DoubleType()),
+    StructField("BATTERY_START_SOC", DoubleType()),
+    StructField("BATTERY_END_SOC", DoubleType()),
+    StructField("ENERGY_CONSUMED_KWH", DoubleType()),
+    StructField("NOTES", StringType()),
+    StructField("LOGGED_AT", TimestampType()),
+])
+
+MAINT_SCHEMA = StructType([
+    StructField("FORKLIFT_ID", StringType()),
+    StructField("TASK_NAME", StringType()),
+    StructField("TYPE", StringType()),
+    StructField("FREQUENCY_HOURS", IntegerType()),
+    StructField("FREQUENCY_MONTHS", IntegerType()),
+    StructField("LAST_PERFORMED_DATE", DateType()),
+    StructField("LAST_PERFORMED_HOUR_METER", DoubleType()),
+    StructField("NEXT_DUE_DATE", DateType()),
+    StructField("NEXT_DUE_HOURS", DoubleType()),
+    StructField("IS_ACTIVE", BooleanType()),
+    StructField("NOTES", StringType()),
+])
+
+RECORD_SCHEMA = StructType([
+    StructField("FORKLIFT_ID", StringType()),
+    StructField("WORK_ORDER_NUMBER", StringType()),
+    StructField("PERFORMED_DATE", DateType()),
+    StructField("HOUR_METER", DoubleType()),
+    StructField("TECHNICIAN", StringType()),
+    StructField("TASK_DESCRIPTION", StringType()),
+    StructField("PARTS_USED", StringType()),
+    StructField("LABOR_HOURS", DoubleType()),
+    StructField("COST", DoubleType()),
+    StructField("DOWNTIME_HOURS", DoubleType()),
+    StructField("STATUS", StringType()),
+    StructField("CREATED_AT", TimestampType()),
+])
+
+FAULTS_SCHEMA = StructType([
+    StructField("FORKLIFT_ID", StringType()),
+    StructField("REPORTED_DATE", TimestampType()),
+    StructField("REPORTED_BY", StringType()),
+    StructField("FAULT_CODE", StringType()),
+    StructField("DESCRIPTION", StringType()),
+    StructField("PRIORITY", StringType()),
+    StructField("STATUS", StringType()),
+    StructField("RESOLVED_DATE", TimestampType()),
+    StructField("ROOT_CAUSE", StringType()),
+    StructField("RESOLUTION_NOTES", StringType()),
+    StructField("DOWNTIME_HOURS", DoubleType()),
+])
+
+def insert_row(table_name, schema, values):
+    # Single-row bound INSERT; skips the DataFrame temp-stage upload path
+    columns = ", ".join(schema.names)
+    placeholders = ", ".join(["?"] * len(schema.names))
+    session.sql(
+        f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})",
+        params=list(values),
+    ).collect()
+
+def bulk_append(df, table_name):
+    # Multi-row loads go through write_pandas (Parquet -> stage -> COPY INTO)
+    *database, schema_name, table = table_name.split(".")
+    session.write_pandas(
+        df,
+        table,
+        database=database[0] if database else None,
+        schema=schema_name,
+        auto_create_table=False,
+        overwrite=False,
+        chunk_size=100_000,
+        use_logical_type=True,
+    )
+
+# Stamped with datetime.now() by the single-row forms; CSV rows without them
+# would sort last in the newest-first views
+AUDIT_COLUMNS = ("CREATED_AT", "LOGGED_AT", "REPORTED_DATE")
+
+def bulk_import_tab(table_name, schema, key, on_success=None):
+    st.subheader("📥 Bulk Import CSV")
+    st.caption(f"Expected columns: {', '.join(schema.names)}")
+
+    uploaded = st.file_uploader("CSV File", type="csv", key=f"{key}_csv")
+    if uploaded is None:
+        return
+
+    try:
+        df = pd.read_csv(uploaded)
+    except Exception as e:
+        st.error(f"❌ Could not read CSV: {e}")
+        return
+    df.columns = [c.strip().upper() for c in df.columns]
+
+    unknown = [c for c in df.columns if c not in schema.names]
+    if unknown:
+        st.error(f"Unknown column(s): {', '.join(unknown)}")
+        return
+
+    now = datetime.now()
+    for c in AUDIT_COLUMNS:
+        if c in schema.names and c not in df.columns:
+            df[c] = now
+
+    st.dataframe(df.head(20), use_container_width=True)
+
+    if st.button(f"Import {len(df)} Row(s)", key=f"{key}_import"):
+        try:
+            bulk_append(df, table_name)
+            if on_success:
+                on_success()
+            st.success(f"✅ {len(df)} row(s) imported into {table_name}!")
+            st.rerun()
+        except Exception as e:
+            st.error(f"❌ Error: {e}")
 
 # ---------------------------------------------------------
 # DASHBOARD
 # ---------------------------------------------------------
-if page == "Dashboard":
+def dashboard(session):
     st.header("📊 Fleet Dashboard")
 
-    total = session.table("OPERATIONS.FORKLIFTS").count()
-    operational = session.table("OPERATIONS.FORKLIFTS").filter(col("STATUS") == "Operational").count()
-    maintenance = session.table("OPERATIONS.FORKLIFTS").filter(col("STATUS") == "In Maintenance").count()
-    charging = session.table("OPERATIONS.FORKLIFTS").filter(col("STATUS") == "Charging").count()
+    # Submit both dashboard queries up front so they run concurrently;
+    # the status aggregate (counts + shares) feeds the tiles and the pie chart
+    status_job = session.sql("""
+        SELECT
+            STATUS,
+            COUNT(*) AS CNT,
+            COUNT(*) / SUM(COUNT(*)) OVER () AS PCT
+        FROM OPERATIONS.FORKLIFTS
+        GROUP BY STATUS
+    """).to_pandas(block=False)
+    usage_job = session.sql("""
+        SELECT
+            SHIFT_DATE,
+            SUM(END_HOUR_METER - START_HOUR_METER) AS HOURS,
+            SUM(ENERGY_CONSUMED_KWH) AS ENERGY_KWH
+        FROM OPERATIONS.USAGE_LOG
+        WHERE SHIFT_DATE > DATEADD(day, -7, CURRENT_DATE())
+        GROUP BY SHIFT_DATE
+        ORDER BY SHIFT_DATE
+    """).to_pandas(block=False)
+
+    df_status = status_job.result().rename(
+        columns={"STATUS": "Status", "CNT": "Count", "PCT": "Share"}
+    )
+    df_usage = usage_job.result()
+    status_counts = dict(zip(df_status["Status"], df_status["Count"]))
 
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Total Forklifts", total)
-    c2.metric("Operational", operational)
-    c3.metric("In Maintenance", maintenance)
-    c4.metric("Charging", charging)
+    c1.metric("Total Forklifts", int(df_status["Count"].sum()))
+    c2.metric("Operational", status_counts.get("Operational", 0))
+    c3.metric("In Maintenance", status_counts.get("In Maintenance", 0))
+    c4.metric("Charging", status_counts.get("Charging", 0))
 
     st.subheader("Fleet Status Distribution")
-    status_data = session.table("OPERATIONS.FORKLIFTS").group_by("STATUS").count().collect()
 
-    if status_data:
-        df_status = pd.DataFrame([(r["STATUS"], r["COUNT"]) for r in status_data],
-                                 columns=["Status", "Count"])
-        st.plotly_chart(px.pie(df_status, values="Count", names="Status"))
+    if not df_status.empty:
+        import plotly.express as px  # only the Dashboard needs Plotly
+
+        st.plotly_chart(px.pie(
+            df_status,
+            values="Count",
+            names="Status",
+            hover_data={"Share": ":.1%"}
+        ))
+
+    st.subheader("Fleet Usage (Last 7 Days)")
+
+    if not df_usage.empty:
+        u1, u2 = st.columns(2)
+        u1.line_chart(df_usage, x="SHIFT_DATE", y="HOURS", use_container_width=True)
+        u2.line_chart(df_usage, x="SHIFT_DATE", y="ENERGY_KWH", use_container_width=True)
+    else:
+        st.info("No usage logged in the last 7 days.")
 
 # ---------------------------------------------------------
 # FLEET MANAGEMENT
 # ---------------------------------------------------------
-elif page == "Fleet Management":
+def fleet_management(session):
     st.header("🚛 Fleet Management")
 
-    tab1, tab2, tab3 = st.tabs(["View Fleet", "Add New Forklift", "Update Forklift"])
+    tab1, tab2, tab3, tab4 = st.tabs(["View Fleet", "Add New Forklift", "Update Forklift", "Bulk Import"])
 
     # ---------------- VIEW FLEET ----------------
     with tab1:
-        fleet = session.table("OPERATIONS.FORKLIFTS").collect()
-        if fleet:
-            df = pd.DataFrame([
-                {
-                    "Forklift ID": x["FORKLIFT_ID"],
-                    "Serial": x["SERIAL_NUMBER"],
-                    "Model": x["MODEL"],
-                    "Year": x["MANUFACTURE_YEAR"],
-                    "Capacity": x["RATED_CAPACITY_KG"],
-                    "Location": x["LOCATION_SITE"],
-                    "Status": x["STATUS"]
-                } for x in fleet
-            ])
+        # Only the displayed columns cross the wire
+        df = (
+            session.table("OPERATIONS.FORKLIFTS")
+            .select("FORKLIFT_ID", "SERIAL_NUMBER", "MODEL", "MANUFACTURE_YEAR",
+                    "RATED_CAPACITY_KG", "LOCATION_SITE", "STATUS")
+            .to_pandas()
+            .rename(columns={
+                "FORKLIFT_ID": "Forklift ID",
+                "SERIAL_NUMBER": "Serial",
+                "MODEL": "Model",
+                "MANUFACTURE_YEAR": "Year",
+                "RATED_CAPACITY_KG": "Capacity",
+                "LOCATION_SITE": "Location",
+                "STATUS": "Status",
+            })
+        )
+        if not df.empty:
             st.dataframe(df, use_container_width=True)
 
     # ---------------- ADD NEW FORKLIFT ----------------
@@ -125,69 +395,60 @@ elif page == "Fleet Management":
 
             if submitted:
                 try:
-                    import datetime
-
                     # Use pure Python datetime - NO Snowflake expressions
-                    created_at = datetime.datetime.now()
+                    created_at = datetime.now()
                     updated_at = None
 
-                    df = session.create_dataframe(
-                        [
-                            (
-                                forklift_id,
-                                serial_number,
-                                model,
-                                manufacture_year,
-                                purchase_date,
-                                capacity,
-                                None,               # BATTERY_ID
-                                location,
-                                status,
-                                warranty_expiry,
-                                notes,
-                                created_at,
-                                updated_at
-                            )
-                        ],
-                        schema=StructType([
-                            StructField("FORKLIFT_ID", StringType()),
-                            StructField("SERIAL_NUMBER", StringType()),
-                            StructField("MODEL", StringType()),
-                            StructField("MANUFACTURE_YEAR", IntegerType()),
-                            StructField("PURCHASE_DATE", DateType()),
-                            StructField("RATED_CAPACITY_KG", IntegerType()),
-                            StructField("BATTERY_ID", IntegerType()),
-                            StructField("LOCATION_SITE", StringType()),
-                            StructField("STATUS", StringType()),
-                            StructField("WARRANTY_EXPIRY", DateType()),
-                            StructField("NOTES", StringType()),
-                            StructField("CREATED_AT", TimestampType()),
-                            StructField("UPDATED_AT", TimestampType())
-                        ])
+                    insert_row(
+                        "OPERATIONS.FORKLIFTS",
+                        FORKLIFT_SCHEMA,
+                        (
+                            forklift_id,
+                            serial_number,
+                            model,
+                            manufacture_year,
+                            purchase_date,
+                            capacity,
+                            None,               # BATTERY_ID
+                            location,
+                            status,
+                            warranty_expiry,
+                            notes,
+                            created_at,
+                            updated_at
+                        ),
                     )
-
-                    df.write.mode("append").save_as_table("OPERATIONS.FORKLIFTS")
+                    # New forklifts must show up in the Add Battery dropdown immediately
+                    get_forklift_list.clear()
                     st.success("Forklift added successfully!")
                     st.rerun()
 
                 except Exception as e:
                     st.error(f"❌ Error: {e}")
 
+    # ---------------- BULK IMPORT ----------------
+    with tab4:
+        bulk_import_tab(
+            "OPERATIONS.FORKLIFTS", FORKLIFT_SCHEMA, "forklift",
+            on_success=get_forklift_list.clear
+        )
+
 # -------------------------------------------------------------------
 #OPERATOR MANAGEMENT
 # -------------------------------------------------------------------
 
-elif page == "Operator Management":
+def operator_management(session):
     st.header("👷 Operator Management")
 
-    tab1, tab2, tab3 = st.tabs(["View Operators", "Add Operator", "Delete Operator"])
+    tab1, tab2, tab3, tab4 = st.tabs(["View Operators", "Add Operator", "Delete Operator", "Bulk Import"])
+
+    # Fetched once per rerun and shared by the View and Delete tabs
+    operators = get_operators()
 
     # ---------------------- VIEW OPERATORS ----------------------
     with tab1:
-        data = session.table("OPERATIONS.OPERATORS").collect()
-        if data:
-            df = pd.DataFrame([row.as_dict() for row in data])
-            st.dataframe(df, use_container_width=True)
+        if not operators.empty:
+            st.dataframe(operators, use_container_width=True)
         else:
             st.info("No operators found in database.")
 
@@ -201,22 +462,18 @@ elif page == "Operator Management":
         is_active = st.checkbox("Active", value=True)
 
         if st.button("Add Operator"):
-            if not full_name or not employee_id:
+            # Reject incomplete input before any Snowflake call
+            if not full_name or not employee_id or employment_year is None:
                 st.error("Full name, employee ID and Employment Year are required.")
             else:
-                df = session.create_dataframe(
-                [(employee_id, full_name, employment_year, is_active)],
-                schema=[
-                    "EMPLOYEE_ID",
-                    "FULL_NAME",
-                    "EMPLOYMENT_YEAR",
-                    "IS_ACTIVE"
-                ]
-            )
-
-            df.write.mode("append").save_as_table("OPERATIONS.OPERATORS")
-            st.success(f"Operator '{full_name}' added successfully!")
-            st.rerun()
+                insert_row(
+                    "OPERATIONS.OPERATORS",
+                    OPERATOR_SCHEMA,
+                    (employee_id, full_name, employment_year, is_active),
+                )
+                get_operators.clear()
+                st.success(f"Operator '{full_name}' added successfully!")
+                st.rerun()
 
 
 
@@ -224,11 +481,10 @@ elif page == "Operator Management":
     with tab3:
         st.subheader("🗑 Delete Operator")
 
-        operators = session.table("OPERATIONS.OPERATORS").collect()
-        if operators:
+        if not operators.empty:
             op_map = {
-                f"{row.FULL_NAME} (ID: {row.EMPLOYEE_ID})": row.EMPLOYEE_ID
-                for row in operators
+                f"{row.FULL_NAME} (ID: {row.EMPLOYEE_ID})": row.OPERATOR_ID
+                for row in operators.itertuples()
             }
 
             selected = st.selectbox("Select Operator to Delete", list(op_map.keys()))
@@ -236,8 +492,10 @@ elif page == "Operator Management":
 
             if st.button("Delete Operator"):
                 session.sql(
-                    f"DELETE FROM OPERATIONS.OPERATORS WHERE OPERATOR_ID = {op_id}"
+                    "DELETE FROM OPERATIONS.OPERATORS WHERE OPERATOR_ID = ?",
+                    params=[op_id]
                 ).collect()
+                get_operators.clear()
 
                 st.warning(f"Operator '{selected}' deleted successfully!")
                 st.rerun()
@@ -245,21 +503,32 @@ elif page == "Operator Management":
         else:
             st.info("No operators available to delete.")
 
+    # ---------------------- BULK IMPORT -------------------------
+    with tab4:
+        bulk_import_tab(
+            "OPERATIONS.OPERATORS", OPERATOR_SCHEMA, "operator",
+            on_success=get_operators.clear
+        )
+
 
     
 # ---------------------------------------------------------
 # BATTERY MANAGEMENT
 # ---------------------------------------------------------
-elif page == "Battery Management":
+def battery_management(session):
     st.header("🔋 Battery Management")
 
-    tab1, tab2, tab3 = st.tabs(["Battery Status", "Add Battery", "Charging Sessions"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Battery Status", "Add Battery", "Charging Sessions", "Bulk Import"])
 
     # ---------------------- BATTERY STATUS ----------------------
     with tab1:
-        data = session.table("OPERATIONS.BATTERIES").collect()
-        if data:
-            df = pd.DataFrame([row.as_dict() for row in data])
+        df = (
+            session.table("OPERATIONS.BATTERIES")
+            .select("BATTERY_ID", "BATTERY_SERIAL", "FORKLIFT_ID", "VOLTAGE", "CAPACITY_AH",
+                    "PURCHASE_DATE", "TOTAL_CYCLES", "HEALTH_PERCENTAGE", "LAST_FULL_CHARGE", "STATUS")
+            .to_pandas()
+        )
+        if not df.empty:
             st.dataframe(df, use_container_width=True)
     
     # ---------------------- ADD NEW BATTERY ----------------------
@@ -273,6 +542,7 @@ elif page == "Battery Management":
                 battery_id = st.number_input("Battery ID*", min_value=1, step=1)
                 serial = st.text_input("Battery Serial Number*")
 
+                # get_forklift_list() is cached, so its TTL alone governs freshness
                 forklift_choices = ["None"] + [
                     x["FORKLIFT_ID"] for x in get_forklift_list()
                 ]
@@ -292,71 +562,49 @@ elif page == "Battery Management":
 
             if submitted:
                 try:
-                    import datetime
-                    from snowflake.snowpark.types import (
-                        StructType, StructField,
-                        IntegerType, StringType, DoubleType,
-                        DateType, TimestampType
-                    )
-
                     # Convert "None" → NULL
                     forklift_id = None if assigned == "None" else assigned
 
                     created_at = datetime.now()
                     updated_at = None   # allowed NULL
 
-                    # Build dataframe row
-                    df = session.create_dataframe(
-                        [
-                            (
-                                battery_id,          # 1 BATTERY_ID
-                                serial,              # 2 BATTERY_SERIAL
-                                forklift_id,         # 3 FORKLIFT_ID
-                                voltage,             # 4 VOLTAGE
-                                ah,                  # 5 CAPACITY_AH
-                                purchase,            # 6 PURCHASE_DATE
-                                0,                   # 7 TOTAL_CYCLES
-                                health,  # 8 HEALTH_PERCENTAGE
-                                 None,                # 9 LAST_FULL_CHARGE
-                                status,              # 10 STATUS
-                                created_at,          # 11 CREATED_AT
-                                updated_at           # 12 UPDATED_AT
-                            )
-                        ],
-                        schema=StructType([
-                            StructField("BATTERY_ID", IntegerType()),
-                            StructField("BATTERY_SERIAL", StringType()),
-                            StructField("FORKLIFT_ID", StringType()),
-                            StructField("VOLTAGE", DoubleType()),
-                            StructField("CAPACITY_AH", IntegerType()),
-                            StructField("PURCHASE_DATE", DateType()),
-                            StructField("TOTAL_CYCLES", IntegerType()),
-                            StructField("HEALTH_PERCENTAGE", DoubleType()),
-                            StructField("LAST_FULL_CHARGE", DateType()),
-                            StructField("STATUS", StringType()),
-                            StructField("CREATED_AT", TimestampType()),
-                            StructField("UPDATED_AT", TimestampType())
-                        ])
+                    insert_row(
+                        "OPERATIONS.BATTERIES",
+                        BATTERY_SCHEMA,
+                        (
+                            battery_id,          # 1 BATTERY_ID
+                            serial,              # 2 BATTERY_SERIAL
+                            forklift_id,         # 3 FORKLIFT_ID
+                            voltage,             # 4 VOLTAGE
+                            ah,                  # 5 CAPACITY_AH
+                            purchase,            # 6 PURCHASE_DATE
+                            0,                   # 7 TOTAL_CYCLES
+                            health,  # 8 HEALTH_PERCENTAGE
+                             None,                # 9 LAST_FULL_CHARGE
+                            status,              # 10 STATUS
+                            created_at,          # 11 CREATED_AT
+                            updated_at           # 12 UPDATED_AT
+                        ),
                     )
 
-                    df.write.mode("append").save_as_table("OPERATIONS.BATTERIES")
-
                     st.success("Battery added successfully!")
                     st.rerun()
 
                 except Exception as e:
                     st.error(f"❌ Error: {e}")
 
+    # ---------------------- BULK IMPORT ----------------------
+    with tab4:
+        bulk_import_tab("OPERATIONS.BATTERIES", BATTERY_SCHEMA, "battery")
+
 
 # ---------------------------------------------------------
 # USAGE LOGGING
 # ---------------------------------------------------------
-elif page == "Usage Logging":
+def usage_logging(session):
     st.header("📝 Daily Usage Logging")
 
-    tab1, tab2 = st.tabs(["Log Usage", "View History"])
-
-    submit = False  # defensive initialization
+    tab1, tab2, tab3 = st.tabs(["Log Usage", "View History", "Bulk Import"])
 
 
 # ====================== LOG USAGE ======================
@@ -381,9 +629,9 @@ elif page == "Usage Logging":
                 st.error("End Hour Meter cannot be less than Start Hour Meter.")
                 st.stop()
 
-    # Create a DataFrame with the logged usage data
-            df = session.create_dataframe(
-            [
+            insert_row(
+                "OPERATIONS.USAGE_LOG",
+                USAGE_SCHEMA,
                 (
                     forklift_id,
                     shift_date,
@@ -394,23 +642,8 @@ elif page == "Usage Logging":
                     energy_consumed_kwh,
                     notes,
                     datetime.now()
-                )
-            ],
-            schema=StructType([
-                StructField("FORKLIFT_ID", StringType()),
-                StructField("SHIFT_DATE", DateType()),
-                StructField("START_HOUR_METER", DoubleType()),
-                StructField("END_HOUR_METER", DoubleType()),
-                StructField("BATTERY_START_SOC", DoubleType()),
-                StructField("BATTERY_END_SOC", DoubleType()),
-                StructField("ENERGY_CONSUMED_KWH", DoubleType()),
-                StructField("NOTES", StringType()),
-                StructField("LOGGED_AT", TimestampType())
-            ])
-        )
-
-    # Save the DataFrame to the specified table
-            df.write.mode("append").save_as_table("OPERATIONS.USAGE_LOG")
+                ),
+            )
             st.success("✅ Usage logged successfully!")
             st.rerun()  # Refresh the app to show updated data
 
@@ -418,22 +651,31 @@ elif page == "Usage Logging":
     with tab2:
 
 # Fetch and display logged usage data
-        log_data = session.table("usage_log").to_pandas()
+        log_data = (
+            session.table("OPERATIONS.USAGE_LOG")
+            .sort(col("LOGGED_AT").desc())
+            .limit(VIEW_ROW_LIMIT)
+            .to_pandas()
+        )
 
         if not log_data.empty:
+            if len(log_data) == VIEW_ROW_LIMIT:
+                st.caption(f"Showing the latest {VIEW_ROW_LIMIT} entries.")
             st.dataframe(log_data)
         else:
             st.write("No usage logs found.")
 
+# ====================== BULK IMPORT ======================
+    with tab3:
+        bulk_import_tab("OPERATIONS.USAGE_LOG", USAGE_SCHEMA, "usage")
+
 
 
 # ====================== MAINTENANCE & SERVICE SCHEDULE ==============
-elif page == "Maintenance":
+def maintenance(session):
     st.header("Maintenance Schedule")
 
-    tab1, tab2 = st.tabs(["View Schedule", "Add Maintenance Task"])
-
-    submit = False
+    tab1, tab2, tab3 = st.tabs(["View Schedule", "Add Maintenance Task", "Bulk Import"])
 
 # ----------------------------------------------------------------
 # VIEW MAINTENANCE SCHEDULE
@@ -441,9 +683,14 @@ elif page == "Maintenance":
 
     with tab1:
         st.subheader("Maintenance Schedule")
-        data = session.table("OPERATIONS.MAINTENANCE_SCHEDULE").collect()
-        if data:
-            df = pd.DataFrame([row.as_dict() for row in data])
+        df = (
+            session.table("OPERATIONS.MAINTENANCE_SCHEDULE")
+            .select("FORKLIFT_ID", "TASK_NAME", "TYPE", "FREQUENCY_HOURS", "FREQUENCY_MONTHS",
+                    "LAST_PERFORMED_DATE", "LAST_PERFORMED_HOUR_METER", "NEXT_DUE_DATE",
+                    "NEXT_DUE_HOURS", "IS_ACTIVE", "NOTES")
+            .to_pandas()
+        )
+        if not df.empty:
             st.dataframe(df, use_container_width=True)
         else:
             st.info("No maintenance schedules found in database.")
@@ -475,70 +722,60 @@ elif page == "Maintenance":
             if not forklift_id or not task_name:
                 st.error("Forklift ID and Task Name are required.")
             else:
-                next_due_date = (last_date + timedelta(days=frequency_months * 30)
-                                if frequency_months > 0 
-                                else None)
-                next_due_hours = (last_hours + frequency_hours
-                                 if frequency_hours > 0
-                                 else None)
-                
-           # Create a DataFrame with the logged usage data
-            df = session.create_dataframe(
-            [
-                (
-                    forklift_id,
-                    task_name,
-                    type,
-                    frequency_hours,
-                    frequency_months,
-                    last_date,
-                    last_hours,
-                    next_date,
-                    next_hours,
-                    is_active,
-                    notes
+                insert_row(
+                    "OPERATIONS.MAINTENANCE_SCHEDULE",
+                    MAINT_SCHEMA,
+                    (
+                        forklift_id,
+                        task_name,
+                        type,
+                        frequency_hours,
+                        frequency_months,
+                        last_date,
+                        last_hours,
+                        next_date,
+                        next_hours,
+                        is_active,
+                        notes
+                    ),
                 )
-            ],
-            schema=StructType([
-                StructField("FORKLIFT_ID", StringType()),
-                StructField("TASK_NAME", StringType()),
-                StructField("TYPE", StringType()),
-                StructField("FREQUENCY_HOURS", IntegerType()),
-                StructField("FREQUENCY_MONTHS", IntegerType()),
-                StructField("LAST_PERFORMED_DATE", DateType()),
-                StructField("LAST_PERFORMED_HOUR_METER", DoubleType()),
-                StructField("NEXT_DUE_DATE", DateType()),
-                StructField("NEXT_DUE_HOURS", DoubleType()),
-                StructField("IS_ACTIVE", BooleanType()),
-                StructField("NOTES", StringType())
-            ])
-        ) 
-
-    # Save the DataFrame to the specified table
-            df.write.mode("append").save_as_table("OPERATIONS.MAINTENANCE_SCHEDULE")
-            st.success("✅ Maintenance Scheduled successfully!")
-            st.rerun()  # Refresh the app     
+                st.success("✅ Maintenance Scheduled successfully!")
+                st.rerun()  # Refresh the app
+
+# ------------------------------------------------------------------
+# BULK IMPORT MAINTENANCE SCHEDULE
+# ------------------------------------------------------------------
+
+    with tab3:
+        bulk_import_tab("OPERATIONS.MAINTENANCE_SCHEDULE", MAINT_SCHEMA, "maint_schedule")
         
 
 # -------------------------------------------------------------------
 # MAINTENANCE HISTORY
 # -------------------------------------------------------------------
 
-elif page == "Maintenance History":
+def maintenance_history(session):
     st.header("Maintenance Record")
     
-    tab1, tab2 = st.tabs(["📋 View Records", "➕ Log Maintenance"])
-
-    submit = False
+    tab1, tab2, tab3 = st.tabs(["📋 View Records", "➕ Log Maintenance", "📥 Bulk Import"])
 
 # =========================================================
 # VIEW RECORDS
 # =========================================================
     with tab1:
         st.subheader("📋 Maintenance History")
-        data = session.table("OPERATIONS.MAINTENANCE_RECORDS").collect()
-        if data:
-            df = pd.DataFrame([row.as_dict() for row in data])
+        df = (
+            session.table("OPERATIONS.MAINTENANCE_RECORDS")
+            .select("FORKLIFT_ID", "WORK_ORDER_NUMBER", "PERFORMED_DATE", "HOUR_METER",
+                    "TECHNICIAN", "TASK_DESCRIPTION", "PARTS_USED", "LABOR_HOURS", "COST",
+                    "DOWNTIME_HOURS", "STATUS")
+            .sort(col("PERFORMED_DATE").desc())
+            .limit(VIEW_ROW_LIMIT)
+            .to_pandas()
+        )
+        if not df.empty:
+            if len(df) == VIEW_ROW_LIMIT:
+                st.caption(f"Showing the latest {VIEW_ROW_LIMIT} records.")
             st.dataframe(df, use_container_width=True)
         else:
             st.info("No maintenance history found in database.")
@@ -602,7 +839,8 @@ elif page == "Maintenance History":
             if not forklift_id:
                 st.error("Forklift ID is required.")
             else:
-                df_insert = session.create_dataframe(
+                # Exact column names from RECORD_SCHEMA; write_pandas quotes them
+                record = pd.DataFrame(
                     [
                         (
                             forklift_id,
@@ -619,46 +857,42 @@ elif page == "Maintenance History":
                             datetime.now(),   # ✅ created_at
                         )
                     ],
-                    schema=StructType([
-                        StructField("FORKLIFT_ID", StringType()),
-                        StructField("WORK_ORDER_NUMBER", StringType()),
-                        StructField("PERFORMED_DATE", DateType()),
-                        StructField("HOUR_METER", DoubleType()),
-                        StructField("TECHNICIAN", StringType()),
-                        StructField("TASK_DESCRIPTION", StringType()),
-                        StructField("PARTS_USED", StringType()),
-                        StructField("LABOR_HOURS", DoubleType()),
-                        StructField("COST", DoubleType()),
-                        StructField("DOWNTIME_HOURS", DoubleType()),
-                        StructField("STATUS", StringType()),
-                        StructField("CREATED AT", DateType())
-                    ])
+                    columns=RECORD_SCHEMA.names
                 )
-
-                df_insert.write.mode("append").save_as_table("OPERATIONS.MAINTENANCE_RECORDS")
+                bulk_append(record, "OPERATIONS.MAINTENANCE_RECORDS")
                 st.success("✅ Maintenance record logged successfully!")
                 st.rerun()
 
+# =========================================================
+# BULK IMPORT RECORDS
+# =========================================================
+    with tab3:
+        bulk_import_tab("OPERATIONS.MAINTENANCE_RECORDS", RECORD_SCHEMA, "maint_record")
+
 
 # ---------------------------------------------------------
 # FAULT REPORTING
 # ---------------------------------------------------------
 
-elif page == "Fault Reporting":
+def fault_reporting(session):
     st.header("Fault Reporting")
     
-    tab1, tab2 = st.tabs(["📋 View Faults", "➕ Report Fault"])
-
-    submit = False
+    tab1, tab2, tab3 = st.tabs(["📋 View Faults", "➕ Report Fault", "📥 Bulk Import"])
 
 # =========================================================
 # VIEW FAULTS
 # =========================================================
     with tab1:
         st.subheader("📋 View Faults")
-        data = session.table("OPERATIONS.FAULTS").collect()
-        if data:
-            df = pd.DataFrame([row.as_dict() for row in data])
+        df = (
+            session.table("OPERATIONS.FAULTS")
+            .sort(col("REPORTED_DATE").desc())
+            .limit(VIEW_ROW_LIMIT)
+            .to_pandas()
+        )
+        if not df.empty:
+            if len(df) == VIEW_ROW_LIMIT:
+                st.caption(f"Showing the latest {VIEW_ROW_LIMIT} faults.")
             st.dataframe(df, use_container_width=True)
         else:
             st.info("No faults Log found in database.")
@@ -670,51 +904,58 @@ elif page == "Fault Reporting":
         st.subheader("➕ Report New Fault")
 
         with st.form("fault_form"):
-            forklift_id = st.text_input("Forklift ID *")
-            reported_date = st.date_input("Reported Date", value=None)
+            forklift_id = st.text_input("Forklift ID *", key="fault_forklift_id")
+            reported_date = st.date_input("Reported Date", value=None, key="fault_reported_date")
             reported_by = st.text_input(
                 "Reported By (Operator ID)",
+                key="fault_reported_by"
             )
 
-            fault_code = st.text_input("Fault Code")
+            fault_code = st.text_input("Fault Code", key="fault_code")
 
             description = st.text_area(
-                "Fault Description *"
+                "Fault Description *",
+                key="fault_description"
             )
 
             priority = st.selectbox(
                 "Priority",
                 ["Low", "Medium", "High", "Critical"],
-                index=1
+                index=1,
+                key="fault_priority"
             )
 
             status = st.selectbox(
                 "Status",
                 ["Open", "In Progress", "Resolved"],
-                index=0
+                index=0,
+                key="fault_status"
             )
 
             resolved_date = st.date_input(
                 "Resolved Date",
-                value=None
+                value=None,
+                key="fault_resolved_date"
             )
 
-            root_cause = st.text_area("Root Cause")
-            resolution_notes = st.text_area("Resolution Notes")
+            root_cause = st.text_area("Root Cause", key="fault_root_cause")
+            resolution_notes = st.text_area("Resolution Notes", key="fault_resolution_notes")
 
             downtime_hours = st.number_input(
                 "Downtime Hours",
                 min_value=0.0,
-                step=0.25
+                step=0.25,
+                key="fault_downtime_hours"
             )
 
             submit = st.form_submit_button("🚨 Submit Fault")
+            queue = st.form_submit_button("➕ Add to Batch")
 
 # ---------------------------------------------------------
 # PROCESS SUBMISSION
 # ---------------------------------------------------------
    
-        if submit:
+        if submit or queue:
             if not forklift_id or not description:
                 st.error("Forklift ID and Description are required.")
             else:
@@ -729,135 +970,151 @@ elif page == "Fault Reporting":
                     if resolved_date else None
                 )
 
-                df_insert = session.create_dataframe(
-                    [
-                        (
-                            forklift_id,
-                            reported_ts,
-                            reported_by if reported_by else None,
-                            fault_code or None,
-                            description,
-                            priority,
-                            status,
-                            resolved_ts,
-                            root_cause or None,
-                            resolution_notes or None,
-                            downtime_hours or None
-                        )
-                    ],
-                    schema=StructType([
-                        StructField("FORKLIFT_ID", StringType()),
-                        StructField("REPORTED_DATE", TimestampType()),
-                        StructField("REPORTED_BY", StringType()),
-                        StructField("FAULT_CODE", StringType()),
-                        StructField("DESCRIPTION", StringType()),
-                        StructField("PRIORITY", StringType()),
-                        StructField("STATUS", StringType()),
-                        StructField("RESOLVED_DATE", TimestampType()),
-                        StructField("ROOT_CAUSE", StringType()),
-                        StructField("RESOLUTION_NOTES", StringType()),
-                        StructField("DOWNTIME_HOURS", DoubleType())
-                    ])
+                fault_row = (
+                    forklift_id,
+                    reported_ts,
+                    reported_by if reported_by else None,
+                    fault_code or None,
+                    description,
+                    priority,
+                    status,
+                    resolved_ts,
+                    root_cause or None,
+                    resolution_notes or None,
+                    downtime_hours or None
                 )
 
-                df_insert.write.mode("append").save_as_table(
-                    "NNL_FORKLIFT_FLEET_DB.OPERATIONS.FAULTS"
-                )
+                if queue:
+                    st.session_state.setdefault("pending_faults", []).append(fault_row)
+                    # Reset the form only once the fault is queued, so a second
+                    # click can't queue it again and failed validation keeps input
+                    for k in [k for k in st.session_state if k.startswith("fault_")]:
+                        del st.session_state[k]
+                    st.success("Fault added to batch.")
+                    st.rerun()
+                else:
+                    insert_row(
+                        "NNL_FORKLIFT_FLEET_DB.OPERATIONS.FAULTS",
+                        FAULTS_SCHEMA,
+                        fault_row,
+                    )
 
-                st.success("✅ Fault reported successfully!")
-                st.rerun()
+                    st.success("✅ Fault reported successfully!")
+                    st.rerun()
+
+# ---------------------------------------------------------
+# FLUSH QUEUED FAULTS
+# ---------------------------------------------------------
+        # Queued faults are written in one write_pandas load instead of
+        # one statement per click
+        pending = st.session_state.get("pending_faults", [])
+        if pending:
+            st.subheader(f"🗂 Pending Faults ({len(pending)})")
+            pending_df = pd.DataFrame(pending, columns=FAULTS_SCHEMA.names)
+            st.dataframe(pending_df, use_container_width=True)
+
+            if st.button("Flush 🚀"):
+                try:
+                    bulk_append(pending_df, "NNL_FORKLIFT_FLEET_DB.OPERATIONS.FAULTS")
+                    st.session_state.pending_faults = []
+                    st.success(f"✅ {len(pending_df)} fault(s) reported successfully!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ Error: {e}")
+
+# =========================================================
+# BULK IMPORT FAULTS
+# =========================================================
+    with tab3:
+        bulk_import_tab("NNL_FORKLIFT_FLEET_DB.OPERATIONS.FAULTS", FAULTS_SCHEMA, "faults")
 
 
 
 # ---------------------------------------------------------
 # ANALYTICS
 # ---------------------------------------------------------
-elif page == "Analytics":
-    st.header("📈 Fleet Analytics")
+# Fragment: changing the multiselect reruns only this block, not the
+# utilization/energy/cost queries above it
+@st.fragment
+def monthly_trend_block(forklift_list):
+    selected_forklifts = st.multiselect(
+        "Select Forklift(s)",
+        options=forklift_list,
+        default=[]  # opt-in: no trend query until the user picks a forklift
+    )
 
-    st.subheader("Utilization (Last 30 Days)")
-    util = session.sql("""
-        SELECT 
-            FORKLIFT_ID,
-            AVG(END_HOUR_METER - START_HOUR_METER) AS AVG_HOURS,
-            COUNT(*) AS DAYS_LOGGED
-        FROM OPERATIONS.USAGE_LOG
-        WHERE SHIFT_DATE >= DATEADD(day, -30, CURRENT_DATE())
-        GROUP BY 1
-        ORDER BY AVG_HOURS DESC
-    """).collect()
-
-    if util:
-        df = pd.DataFrame([{
-            "Forklift": x["FORKLIFT_ID"],
-            "Avg Hours/Day": round(x["AVG_HOURS"], 2),
-            "Days Logged": x["DAYS_LOGGED"]
-        } for x in util])
-        st.dataframe(df, use_container_width=True)
+    if selected_forklifts:
+        pdf = fetch_monthly_cost(tuple(sorted(selected_forklifts)))
 
-    st.subheader("Energy Consumption (Last 30 Days)")
-    energy = session.sql("""
-        SELECT 
-            FORKLIFT_ID,
-            SUM(ENERGY_CONSUMED_KWH) AS TOTAL_ENERGY,
-            AVG(ENERGY_CONSUMED_KWH) AS AVG_ENERGY
-        FROM OPERATIONS.USAGE_LOG
-        WHERE SHIFT_DATE >= DATEADD(day, -30, CURRENT_DATE())
-        GROUP BY 1
-        ORDER BY TOTAL_ENERGY DESC
-    """).collect()
-
-    if energy:
-        df = pd.DataFrame([{
-            "Forklift": x["FORKLIFT_ID"],
-            "Total kWh": round(x["TOTAL_ENERGY"], 2),
-            "Avg kWh": round(x["AVG_ENERGY"], 2),
-        } for x in energy])
-        st.dataframe(df, use_container_width=True)
-    
-    st.subheader("💰 Maintenance Cost Summary by Forklift")
+        st.line_chart(
+            pdf,
+            x="MONTH",
+            y="MONTHLY_COST",
+            color="FORKLIFT_ID",
+            use_container_width=True
+        )
 
-    from snowflake.snowpark.functions import col, sum as sf_sum, expr
+    else:
+        st.info("Select at least one forklift to view trends.")
 
-    maintenance_df = session.table(
-        "NNL_FORKLIFT_FLEET_DB.OPERATIONS.MAINTENANCE_RECORDS"
-    )
 
-    # Total maintenance cost (all time)
-    total_cost_df = (
-        maintenance_df
-        .group_by(col("FORKLIFT_ID"))
-        .agg(
-            sf_sum(col("COST")).alias("TOTAL_MAINTENANCE_COST")
-        )
-    )
+def analytics(session):
+    st.header("📈 Fleet Analytics")
 
-    # Maintenance cost in last 30 days
-    last_30_days_cost_df = (
-        maintenance_df
-        .filter(
-            col("PERFORMED_DATE") >= expr("DATEADD(day, -30, CURRENT_DATE())")
-        )
-        .group_by(col("FORKLIFT_ID"))
-        .agg(
-            sf_sum(col("COST")).alias("LAST_30_DAYS_COST")
+    try:
+        usage_30d = fetch_usage_30d()
+    except SnowparkSQLException as e:
+        report_missing_object(e, "ops_usage_30d.sql")
+        usage_30d = pd.DataFrame(
+            columns=["FORKLIFT_ID", "AVG_HOURS", "DAYS_LOGGED", "TOTAL_ENERGY", "AVG_ENERGY"]
         )
+
+    st.subheader("Utilization (Last 30 Days)")
+    util = (
+        usage_30d[["FORKLIFT_ID", "AVG_HOURS", "DAYS_LOGGED"]]
+        .sort_values("AVG_HOURS", ascending=False)
     )
 
-    # Combine results
-    summary_df = (
-        total_cost_df
-        .join(
-            last_30_days_cost_df,
-            on="FORKLIFT_ID",
-            how="left"
-        )
-        .fillna({"LAST_30_DAYS_COST": 0})
-        .sort(col("TOTAL_MAINTENANCE_COST").desc())
+    if not util.empty:
+        df = util.rename(columns={
+            "FORKLIFT_ID": "Forklift",
+            "AVG_HOURS": "Avg Hours/Day",
+            "DAYS_LOGGED": "Days Logged"
+        })
+        df["Avg Hours/Day"] = df["Avg Hours/Day"].round(2)
+        st.dataframe(df, use_container_width=True)
+
+    st.subheader("Energy Consumption (Last 30 Days)")
+    energy = (
+        usage_30d[["FORKLIFT_ID", "TOTAL_ENERGY", "AVG_ENERGY"]]
+        .sort_values("TOTAL_ENERGY", ascending=False)
     )
 
+    if not energy.empty:
+        df = energy.rename(columns={
+            "FORKLIFT_ID": "Forklift",
+            "TOTAL_ENERGY": "Total kWh",
+            "AVG_ENERGY": "Avg kWh"
+        })
+        df[["Total kWh", "Avg kWh"]] = df[["Total kWh", "Avg kWh"]].round(2)
+        st.dataframe(df, use_container_width=True)
+    
+    st.subheader("💰 Maintenance Cost Summary by Forklift")
+
+    show_all = st.checkbox(f"Show all forklifts (default: top {SUMMARY_ROW_LIMIT} by cost)")
+    try:
+        summary_pdf = fetch_maintenance_summary()
+    except SnowparkSQLException as e:
+        report_missing_object(e, "ops_maint_daily.sql")
+        # Numeric dtypes so nlargest() below still works on the empty frame
+        summary_pdf = pd.DataFrame({
+            "FORKLIFT_ID": pd.Series(dtype="object"),
+            "TOTAL_MAINTENANCE_COST": pd.Series(dtype="float64"),
+            "LAST_30_DAYS_COST": pd.Series(dtype="float64"),
+        })
+
     st.dataframe(
-        summary_df.to_pandas(),
+        summary_pdf if show_all else summary_pdf.head(SUMMARY_ROW_LIMIT),
         use_container_width=True
     )
 
@@ -865,15 +1122,10 @@ elif page == "Analytics":
 
     st.subheader("🏆 Top 5 Most Expensive Forklifts (All-Time)")
 
-    top5_df = (
-        summary_df
-        .select(
-            col("FORKLIFT_ID"),
-            col("TOTAL_MAINTENANCE_COST")
-        )
-        .limit(5)
-        .to_pandas()
-    )
+    # Reuse the materialized summary rather than re-running it in Snowflake
+    top5_df = summary_pdf.nlargest(5, "TOTAL_MAINTENANCE_COST")[
+        ["FORKLIFT_ID", "TOTAL_MAINTENANCE_COST"]
+    ]
 
 # Bar chart
     st.bar_chart(
@@ -887,61 +1139,38 @@ elif page == "Analytics":
 
     st.subheader("📊 Monthly Maintenance Cost Trend per Forklift")
 
-    from snowflake.snowpark.functions import col, sum as sf_sum, expr
-
 # Optional forklift filter
-    forklift_list = (
-        session.table("NNL_FORKLIFT_FLEET_DB.OPERATIONS.MAINTENANCE_RECORDS")
-        .select("FORKLIFT_ID")
-        .distinct()
-        .sort("FORKLIFT_ID")
-        .to_pandas()["FORKLIFT_ID"]
-        .tolist()
-    )
-
-    selected_forklifts = st.multiselect(
-        "Select Forklift(s)",
-        options=forklift_list,
-        default=forklift_list[:1]
-    )
+    # Every forklift with maintenance records is already in summary_pdf
+    forklift_list = summary_pdf["FORKLIFT_ID"].sort_values().tolist()
 
-    if selected_forklifts:
+    monthly_trend_block(forklift_list)
 
-        monthly_df = (
-            session.table("NNL_FORKLIFT_FLEET_DB.OPERATIONS.MAINTENANCE_RECORDS")
-            .filter(col("FORKLIFT_ID").isin(selected_forklifts))
-            .with_column(
-                "MONTH",
-                expr("DATE_TRUNC('month', PERFORMED_DATE)")
-            )
-            .group_by("MONTH", "FORKLIFT_ID")
-            .agg(
-                sf_sum(col("COST")).alias("MONTHLY_COST")
-            )
-            .sort("MONTH")
-        )
-
-        pdf = monthly_df.to_pandas()
-
-    # Pivot for Streamlit chart
-        pivot_df = pdf.pivot(
-            index="MONTH",
-            columns="FORKLIFT_ID",
-            values="MONTHLY_COST"
-        ).fillna(0)
-
-        st.line_chart(
-            pivot_df,
-            use_container_width=True
-        )
-
-    else:
-        st.info("Select at least one forklift to view trends.")
 
+# ---------------------------------------------------------
+# SIDEBAR NAVIGATION
+# ---------------------------------------------------------
+# Only the selected page's function runs on each rerun
+PAGES = {
+    "Dashboard": dashboard,
+    "Fleet Management": fleet_management,
+    "Operator Management": operator_management,
+    "Battery Management": battery_management,
+    "Usage Logging": usage_logging,
+    "Maintenance": maintenance,
+    "Maintenance History": maintenance_history,
+    "Fault Reporting": fault_reporting,
+    "Analytics": analytics,
+}
 
+st.sidebar.title("Navigation")
+page = st.sidebar.selectbox("Select Page", list(PAGES))
 
+# Tag every statement with app + page; only re-set when the page changes
+if st.session_state.get("query_tag_page") != page:
+    session.query_tag = json.dumps({"app": APP_QUERY_TAG, "page": page})
+    st.session_state.query_tag_page = page
 
-    
+PAGES[page](session)
 
 # ---------------------------------------------------------
 # FOOTER